@@ -1,14 +1,31 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
+import asyncio
+import os
 import time
+import timeit
 import io
-from typing import List, Dict, Any
+import codecs
+import csv
+import operator
+import sys
+import threading
+from typing import List, Dict, Any, BinaryIO, Callable, Iterable, Iterator, Sequence, Tuple, Union
+from itertools import chain
+from functools import lru_cache, wraps
+from hashlib import blake2b
+from types import MappingProxyType
 import re
-import heapq
+import numpy as np
+import orjson
 from collections import defaultdict
 
-app = FastAPI(title="Bus Boarding Optimizer API", version="1.0.0")
+app = FastAPI(
+    title="Bus Boarding Optimizer API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 # Add CORS middleware
 app.add_middleware(
@@ -19,108 +36,294 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Precompiled pattern for seat labels
+_SEAT_PARTS_RE = re.compile(r'^([A-D])(\d+)$')
+
+# Column weights for accessibility
+COLUMN_WEIGHTS = MappingProxyType({'A': 0.3, 'B': 0.2, 'C': 0.1, 'D': 0.0})
+SEAT_COLUMNS = frozenset(COLUMN_WEIGHTS)
+# Column weights indexed by ASCII code, for lookups without hashing
+COLUMN_WEIGHT_TABLE = tuple(COLUMN_WEIGHTS.get(chr(code), 0.0) for code in range(128))
+# Highest row number covered by the precomputed seat distance table
+MAX_PRECOMPUTED_ROW = 200
+# Read-only seat distance table (hashmap) for every A-D seat up to MAX_PRECOMPUTED_ROW,
+# built once at import and shared by all requests without locking
+SEAT_DISTANCES = MappingProxyType({
+    f"{column}{row}": float(row) + weight
+    for column, weight in COLUMN_WEIGHTS.items()
+    for row in range(1, MAX_PRECOMPUTED_ROW + 1)
+})
+
+ParsedBookings = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+def _parse_booking_rows(lines: Iterable[str]) -> ParsedBookings:
+    """Parse booking lines into immutable (bookingId, seats) pairs"""
+    bookings = []
+    booking_ids = set()  # Use set for O(1) duplicate detection
+    header_skipped = False
+    
+    # Each line is tokenized on its own so an unterminated quote cannot swallow
+    # the lines after it
+    for line in lines:
+        if '"' in line:
+            # Quoted CSV (101,"A1,B1"): the C csv tokenizer unpacks the seat list and
+            # the first field is the booking ID, which may contain spaces
+            try:
+                row = next(csv.reader((line,), skipinitialspace=True), [])
+            except csv.Error:
+                row = line.split(',')
+            if len(row) < 2:
+                # Malformed CSV: fall back to splitting on commas
+                row = line.split(',')
+            booking_id = row[0].strip()
+            if '"' in booking_id:
+                # Quote opened mid-field (101 "A1,B1"): whitespace separated after all
+                tokens = line.replace('"', ' ').replace(',', ' ').split()
+                booking_id = tokens[0] if tokens else ''
+                seats = tokens[1:]
+            else:
+                seats = ' '.join(row[1:]).replace(',', ' ').replace('"', ' ').split()
+                tokens = [booking_id] + seats if booking_id else seats
+        else:
+            # Tab/space separated (101 A1,B1 or 101 A1 B1)
+            tokens = line.replace(',', ' ').split()
+            booking_id = tokens[0] if tokens else ''
+            seats = tokens[1:]
+        
+        if not tokens:
+            continue
+        if not header_skipped:
+            header_skipped = True
+            continue
+        if not booking_id or not seats:
+            continue
+        
+        # Check for duplicates
+        if booking_id in booking_ids:
+            print(f"Warning: Duplicate booking ID {booking_id}")
+            continue
+        
+        # Validate seat formats: one hash probe into the seat table for the common
+        # case, with the column/digits check only for seats outside the table
+        valid_seats = tuple(
+            seat for seat in seats
+            if seat in SEAT_DISTANCES or (seat[:1] in SEAT_COLUMNS and seat[1:].isdecimal())
+        )
+        if len(valid_seats) != len(seats):
+            print(f"Warning: Invalid seat format in booking {booking_id}")
+        
+        if valid_seats:
+            booking_ids.add(booking_id)
+            bookings.append((booking_id, valid_seats))
+    
+    return tuple(bookings)
+
+# Payloads longer than this are processed without memoization
+MAX_CACHED_PAYLOAD_CHARS = 1 << 18
+# Budgets for the values retained by the payload caches, per worker process
+PARSE_CACHE_BYTES = 16 << 20
+RESPONSE_CACHE_BYTES = 16 << 20
+
+def _payload_cache(max_bytes: int, sizeof: Callable[[Any], int] = sys.getsizeof):
+    """Memoize a function of one str payload, keyed on a 16-byte digest of the payload
+    
+    Unlike lru_cache, the cache holds digests rather than the payload strings, and
+    payloads over MAX_CACHED_PAYLOAD_CHARS bypass it entirely. The least recently used
+    entries are evicted until the sizeof() total of the cached values fits max_bytes;
+    a single value over budget is not cached at all.
+    """
+    def decorator(func):
+        cache: Dict[bytes, Tuple[Any, int]] = {}  # Insertion order doubles as LRU order
+        lock = threading.Lock()
+        total_bytes = 0
+        
+        @wraps(func)
+        def wrapper(data: str):
+            nonlocal total_bytes
+            if len(data) > MAX_CACHED_PAYLOAD_CHARS:
+                return func(data)
+            key = blake2b(data.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+            with lock:
+                if key in cache:
+                    entry = cache[key] = cache.pop(key)  # Move to the most recent end
+                    return entry[0]
+            value = func(data)
+            size = sizeof(value)
+            if size > max_bytes:
+                return value
+            with lock:
+                if key in cache:
+                    total_bytes -= cache.pop(key)[1]
+                cache[key] = (value, size)
+                total_bytes += size
+                while total_bytes > max_bytes:
+                    total_bytes -= cache.pop(next(iter(cache)))[1]
+            return value
+        
+        def cache_clear():
+            nonlocal total_bytes
+            with lock:
+                cache.clear()
+                total_bytes = 0
+        
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_size = cache.__len__
+        wrapper.cache_bytes = lambda: total_bytes
+        return wrapper
+    return decorator
+
+def _parsed_bookings_size(rows: ParsedBookings) -> int:
+    """Approximate bytes retained by parsed rows: the tuples and every string they hold"""
+    getsizeof = sys.getsizeof
+    return (
+        getsizeof(rows)
+        + sum(map(getsizeof, rows))
+        + sum(getsizeof(booking_id) + getsizeof(seats) for booking_id, seats in rows)
+        + sum(map(getsizeof, chain.from_iterable(seats for _, seats in rows)))
+    )
+
+@_payload_cache(max_bytes=PARSE_CACHE_BYTES, sizeof=_parsed_bookings_size)
+def _parse_booking_text(data: str) -> ParsedBookings:
+    """Parse booking text, memoized so repeated identical payloads skip re-parsing"""
+    return _parse_booking_rows(io.StringIO(data))
+
+def _blocking_potential(distances: np.ndarray) -> float:
+    """Sum d[j] - d[i] over pairs i < j with d[j] > d[i] in O(N log N)
+    
+    Each d[k] enters the sum positively once per smaller value before it and
+    negatively once per larger value after it, so only those two counts are needed.
+    Earlier-smaller counts come from a bottom-up merge: at each level, elements in the
+    right half of a block are ranked against the sorted left half with searchsorted.
+    """
+    n = len(distances)
+    if n < 2:
+        return 0.0
+    
+    _, ranks = np.unique(distances, return_inverse=True)
+    ranks = ranks.reshape(-1).astype(np.int64)
+    positions = np.arange(n, dtype=np.int64)
+    earlier_less = np.zeros(n, dtype=np.int64)
+    width = 1
+    while width < n:
+        # Composite keys keep each block's values apart in one global sorted array
+        block_keys = positions // (2 * width) * n
+        in_right = (positions // width) % 2 == 1
+        left_keys = np.sort(block_keys[~in_right] + ranks[~in_right])
+        right_blocks = block_keys[in_right]
+        earlier_less[in_right] += (
+            np.searchsorted(left_keys, right_blocks + ranks[in_right], side='left')
+            - np.searchsorted(left_keys, right_blocks, side='left')
+        )
+        width *= 2
+    
+    # Earlier equal values: position within the run of equal ranks in a stable sort
+    order = np.argsort(ranks, kind='stable')
+    sorted_ranks = ranks[order]
+    earlier_equal = np.empty(n, dtype=np.int64)
+    earlier_equal[order] = positions - np.searchsorted(sorted_ranks, sorted_ranks, side='left')
+    
+    total_greater = n - np.searchsorted(sorted_ranks, ranks, side='right')
+    later_greater = total_greater - (positions - earlier_less - earlier_equal)
+    return float(np.dot(distances, earlier_less - later_greater))
+
 class OptimizedBoardingProcessor:
-    def __init__(self):
-        # Seat distance cache using dictionary (hashmap)
-        self.seat_cache = {}
-        # Column weights for accessibility
-        self.column_weights = {'A': 0.3, 'B': 0.2, 'C': 0.1, 'D': 0.0}
-        # Performance metrics
-        self.cache_hits = 0
-        self.cache_misses = 0
+    """Stateless boarding optimizer, safe to share across concurrent requests"""
     
     def get_seat_distance(self, seat_label: str) -> float:
-        """Get seat distance with caching for O(1) lookup"""
-        if seat_label in self.seat_cache:
-            self.cache_hits += 1
-            return self.seat_cache[seat_label]
-        
-        self.cache_misses += 1
-        distance = self._calculate_seat_distance(seat_label)
-        self.seat_cache[seat_label] = distance
-        return distance
+        """Get seat distance from the precomputed table, computing out-of-range seats on demand"""
+        try:
+            return SEAT_DISTANCES[seat_label]
+        except KeyError:
+            return self._calculate_seat_distance(seat_label)
     
-    def _calculate_seat_distance(self, seat_label: str) -> float:
-        """Calculate distance from front entry for a given seat"""
-        match = re.match(r'^([A-D])(\d+)$', seat_label)
-        if not match:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _calculate_seat_distance(seat_label: str) -> float:
+        """Calculate distance from front entry for a given seat (memoized, thread-safe)"""
+        column = seat_label[:1]
+        digits = seat_label[1:]
+        if column not in SEAT_COLUMNS or not digits.isdecimal():
             raise ValueError(f"Invalid seat format: {seat_label}")
         
-        column = match.group(1)
-        row = int(match.group(2))
-        
         # Base distance is the row number
-        distance = float(row)
+        distance = float(int(digits))
         
         # Add column weight for accessibility
-        distance += self.column_weights.get(column, 0)
+        distance += COLUMN_WEIGHT_TABLE[ord(column)]
         
         return distance
     
     def process_bookings_with_heap(self, bookings: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Process bookings using heap-based priority queue for optimal performance"""
-        start_time = time.time()
-        
-        # Build booking data with distance calculations
-        booking_data = []
-        booking_map = {}  # HashMap for O(1) booking lookup
-        
-        for booking in bookings:
-            booking_id = booking['bookingId']
-            seats = booking['seats']
-            
-            # Calculate distances for all seats
-            seat_distances = [self.get_seat_distance(seat) for seat in seats]
-            max_distance = max(seat_distances)
-            min_distance = min(seat_distances)
-            
-            booking_info = {
-                'bookingId': booking_id,
-                'seats': seats,
-                'maxDistance': max_distance,
-                'minDistance': min_distance,
-                'seatCount': len(seats)
-            }
-            
-            # Store in hashmap for quick access
-            booking_map[booking_id] = booking_info
-            
-            # Add to heap (negative maxDistance for max-heap behavior)
-            # Tuple: (-maxDistance, bookingId, booking_info)
-            heapq.heappush(booking_data, (-max_distance, booking_id, booking_info))
-        
-        # Extract sorted results from heap
-        boarding_sequence = []
-        sequence_num = 1
-        
-        while booking_data:
-            neg_distance, booking_id, booking_info = heapq.heappop(booking_data)
-            
-            boarding_sequence.append({
+        """Process bookings into a boarding sequence ordered by furthest seat"""
+        return self.process_booking_columns(
+            [booking['bookingId'] for booking in bookings],
+            [booking['seats'] for booking in bookings]
+        )
+    
+    def process_booking_columns(self, booking_ids: Sequence[str], seats_lists: Sequence[Sequence[str]]) -> Dict[str, Any]:
+        """Process bookings held as parallel ID and seat lists (struct of arrays)"""
+        start_ns = time.perf_counter_ns()
+        
+        # Flatten every booking's seats and look up all distances in one pass
+        seat_counts = list(map(len, seats_lists))
+        if 0 in seat_counts:
+            raise ValueError(f"Booking {booking_ids[seat_counts.index(0)]} has no seats")
+        
+        all_seats = list(chain.from_iterable(seats_lists))
+        try:
+            # Fast path: C-level table lookups with no Python call per seat
+            distances = np.fromiter(map(SEAT_DISTANCES.__getitem__, all_seats), dtype=np.float64, count=len(all_seats))
+        except KeyError:
+            # Seats beyond the precomputed rows (or invalid labels) go through the checked
+            # calculation; .get avoids raising a KeyError per such seat (table distances are >= 1.0)
+            lookup = SEAT_DISTANCES.get
+            calculate = self._calculate_seat_distance
+            distances = np.fromiter(
+                (lookup(seat) or calculate(seat) for seat in all_seats),
+                dtype=np.float64,
+                count=len(all_seats)
+            )
+        
+        # Per-booking max/min via segmented reductions over the flat distance array
+        if seat_counts:
+            offsets = np.cumsum([0] + seat_counts[:-1])
+            max_distances = np.maximum.reduceat(distances, offsets)
+            min_distances = np.minimum.reduceat(distances, offsets)
+        else:
+            max_distances = min_distances = np.empty(0)
+        
+        # Distances are a row number plus a tenths column weight, so integer tenths order
+        # them exactly. A stable sort on these small-range keys (radix sort when they fit
+        # in int16) over bookings presorted by ID puts the furthest seat first and breaks
+        # ties by booking ID.
+        keys = np.rint(max_distances * -10)
+        key_dtype = np.int16 if keys.size == 0 or keys.min() >= np.iinfo(np.int16).min else np.int64
+        by_id = np.array(sorted(range(len(booking_ids)), key=booking_ids.__getitem__), dtype=np.intp)
+        order = by_id[np.argsort(keys[by_id].astype(key_dtype), kind='stable')]
+        
+        max_distances = max_distances.tolist()
+        min_distances = min_distances.tolist()
+        boarding_sequence = [
+            {
                 'sequence': sequence_num,
-                'bookingId': booking_info['bookingId'],
-                'seats': booking_info['seats'],
-                'maxDistance': booking_info['maxDistance'],
-                'minDistance': booking_info['minDistance']
-            })
-            sequence_num += 1
+                'bookingId': booking_ids[index],
+                'seats': seats_lists[index],
+                'maxDistance': max_distances[index],
+                'minDistance': min_distances[index]
+            }
+            for sequence_num, index in enumerate(order.tolist(), start=1)
+        ]
         
-        processing_time = time.time() - start_time
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
         
         # Log performance metrics (server-side only)
-        cache_hit_rate = self.cache_hits / (self.cache_hits + self.cache_misses) if (self.cache_hits + self.cache_misses) > 0 else 0
-        print(f"Heap-based processing - Time: {processing_time:.4f}s, Cache hits: {self.cache_hits}, Hit rate: {cache_hit_rate:.2%}")
+        print(f"Sequence processing - Time: {processing_time:.4f}s")
         
         return {
             'boardingSequence': boarding_sequence,
             'processingTime': processing_time,
-            'totalBookings': len(bookings),
-            'totalPassengers': sum(len(booking['seats']) for booking in bookings),
-            'cacheStats': {
-                'hits': self.cache_hits,
-                'misses': self.cache_misses,
-                'hitRate': cache_hit_rate
-            }
+            'totalBookings': len(booking_ids),
+            'totalPassengers': len(all_seats)
         }
     
     def analyze_boarding_efficiency(self, sequence: List[Dict[str, Any]]) -> Dict[str, float]:
@@ -128,20 +331,16 @@ class OptimizedBoardingProcessor:
         if not sequence:
             return {'averageDistance': 0, 'blockingPotential': 0, 'optimalityScore': 0}
         
-        distances = [item['maxDistance'] for item in sequence]
-        average_distance = sum(distances) / len(distances)
+        distances = np.fromiter((item['maxDistance'] for item in sequence), dtype=np.float64, count=len(sequence))
+        average_distance = float(distances.mean())
         
-        # Calculate blocking potential
-        blocking_potential = 0
-        for i in range(len(sequence) - 1):
-            for j in range(i + 1, len(sequence)):
-                if sequence[i]['maxDistance'] < sequence[j]['maxDistance']:
-                    blocking_potential += sequence[j]['maxDistance'] - sequence[i]['maxDistance']
+        # Calculate blocking potential: sum of d[j] - d[i] over pairs i < j where d[j] > d[i]
+        blocking_potential = _blocking_potential(distances)
         
         # Optimality score
-        ideal_order = sorted(sequence, key=lambda x: -x['maxDistance'])
-        correct_positions = sum(1 for i, item in enumerate(sequence) 
-                              if item['bookingId'] == ideal_order[i]['bookingId'])
+        booking_ids = [item['bookingId'] for item in sequence]
+        ideal_ids = map(booking_ids.__getitem__, np.argsort(-distances, kind='stable').tolist())
+        correct_positions = sum(map(operator.eq, booking_ids, ideal_ids))
         optimality_score = (correct_positions / len(sequence)) * 100
         
         return {
@@ -149,22 +348,14 @@ class OptimizedBoardingProcessor:
             'blockingPotential': blocking_potential,
             'optimalityScore': optimality_score
         }
-    
-    def clear_cache(self):
-        """Clear the seat distance cache"""
-        self.seat_cache.clear()
-        self.cache_hits = 0
-        self.cache_misses = 0
+
 class BookingProcessor(OptimizedBoardingProcessor):
-    def __init__(self):
-        super().__init__()
-    
-    def calculate_seat_distance(self, seat_label: str) -> float:  # Legacy method
-        return self.get_seat_distance(seat_label)
+    # Legacy name, bound straight to the table lookup to skip a forwarding call
+    calculate_seat_distance = OptimizedBoardingProcessor.get_seat_distance
     
     def _legacy_calculate_seat_distance(self, seat_label: str) -> float:
         """Calculate distance from front entry for a given seat"""
-        match = re.match(r'^([A-D])(\d+)$', seat_label)
+        match = _SEAT_PARTS_RE.match(seat_label)
         if not match:
             raise ValueError(f"Invalid seat format: {seat_label}")
         
@@ -181,142 +372,210 @@ class BookingProcessor(OptimizedBoardingProcessor):
         
         return distance
     
-    def parse_booking_data(self, data: str) -> List[Dict[str, Any]]:
-        """Parse booking data from text input"""
-        lines = data.strip().split('\n')
-        bookings = []
-        booking_ids = set()  # Use set for O(1) duplicate detection
-        
-        for i in range(1, len(lines)):  # Skip header
-            line = lines[i].strip()
-            if not line:
-                continue
-            
-            # Handle CSV format with potential quotes and commas
-            booking_id = ''
-            seats_str = ''
-            
-            # Check if line contains quotes (CSV format)
-            if '"' in line:
-                # Parse CSV format: 101, "A1,B1" or 101,"A1,B1"
-                import re
-                csv_match = re.match(r'^([^,]+),\s*"([^"]+)"', line)
-                if csv_match:
-                    booking_id = csv_match.group(1).strip()
-                    seats_str = csv_match.group(2).strip()
-                else:
-                    # Fallback for malformed CSV
-                    parts = line.split(',')
-                    if len(parts) >= 2:
-                        booking_id = parts[0].strip()
-                        seats_str = ','.join(parts[1:]).replace('"', '').strip()
-            else:
-                # Handle tab/space separated format: 101 A1,B1 or 101	A1,B1
-                parts = re.split(r'[\s,]+', line)
-                if len(parts) < 2:
-                    continue
-                
-                booking_id = parts[0]
-                
-                # Join remaining parts and handle different separators
-                remaining_parts = parts[1:]
-                if len(remaining_parts) == 1 and ',' in remaining_parts[0]:
-                    # Format: 101 A1,B1
-                    seats_str = remaining_parts[0]
-                else:
-                    # Format: 101 A1 B1 (space separated seats)
-                    seats_str = ','.join(remaining_parts)
-            
-            if not booking_id or not seats_str:
-                continue
-            
-            # Check for duplicates
-            if booking_id in booking_ids:
-                print(f"Warning: Duplicate booking ID {booking_id}")
-                continue
-            
-            # Parse seats - handle both comma and space separated
-            seats = [s.strip() for s in re.split(r'[,\s]+', seats_str) if s.strip()]
-            
-            # Validate seat formats
-            valid_seats = [seat for seat in seats if re.match(r'^[A-D]\d+$', seat)]
-            if len(valid_seats) != len(seats):
-                print(f"Warning: Invalid seat format in booking {booking_id}")
-            
-            if valid_seats:
-                booking_ids.add(booking_id)
-                bookings.append({
-                    'bookingId': booking_id,
-                    'seats': valid_seats
-                })
-        
-        return bookings
+    def parse_booking_data(self, data: Union[str, Iterable[str]]) -> List[Dict[str, Any]]:
+        """Parse booking data from text input or an iterable of text lines"""
+        booking_ids, seats_lists = self.parse_booking_columns(data)
+        return [
+            {'bookingId': booking_id, 'seats': list(seats)}
+            for booking_id, seats in zip(booking_ids, seats_lists)
+        ]
+    
+    def parse_booking_columns(self, data: Union[str, Iterable[str]]) -> Tuple[List[str], List[Tuple[str, ...]]]:
+        """Parse booking data into parallel booking ID and seat lists"""
+        # Text payloads are memoized; streamed input (e.g. uploads) is parsed directly
+        rows = _parse_booking_text(data) if isinstance(data, str) else _parse_booking_rows(data)
+        booking_ids = [booking_id for booking_id, _ in rows]
+        seats_lists = [seats for _, seats in rows]
+        return booking_ids, seats_lists
     
     def generate_boarding_sequence(self, bookings: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate optimal boarding sequence using heap-based algorithm"""
+        """Generate optimal boarding sequence sorted by furthest seat first"""
         return self.process_bookings_with_heap(bookings)
 
 processor = BookingProcessor()
 
+# CPU-bound pipeline steps, run via asyncio.to_thread so they don't block the event loop
+
+def _sequence_bookings(data: Union[str, Iterable[str]]) -> Dict[str, Any]:
+    """Parse booking data and build its boarding sequence with efficiency analysis"""
+    booking_ids, seats_lists = processor.parse_booking_columns(data)
+    result = processor.process_booking_columns(booking_ids, seats_lists)
+    result['efficiency'] = processor.analyze_boarding_efficiency(result['boardingSequence'])
+    return result
+
+UPLOAD_CHUNK_SIZE = 65536
+
+def _iter_upload_lines(upload: BinaryIO) -> Iterator[str]:
+    """Decode an uploaded file chunk by chunk from its spooled storage, yielding lines
+    
+    Lines break on '\n' only, as io.StringIO does for pasted text, so both paths
+    tokenize a payload identically.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    partial: List[str] = []  # Pieces of a line still waiting for its newline
+    upload.seek(0)
+    while True:
+        chunk = upload.read(UPLOAD_CHUNK_SIZE)
+        # Only the newly decoded text is split, so a long line costs linear time
+        pieces = decoder.decode(chunk, final=not chunk).split('\n')
+        if len(pieces) > 1:
+            partial.append(pieces[0])
+            yield ''.join(partial) + '\n'
+            for piece in pieces[1:-1]:
+                yield piece + '\n'
+            partial = []
+        if pieces[-1]:
+            partial.append(pieces[-1])
+        if not chunk:
+            break
+    if partial:
+        yield ''.join(partial)
+
+def _sequence_upload(upload: BinaryIO) -> Dict[str, Any]:
+    """Sequence an uploaded file without reading it into memory in one piece"""
+    return _sequence_bookings(_iter_upload_lines(upload))
+
+@_payload_cache(max_bytes=RESPONSE_CACHE_BYTES, sizeof=len)
+def _render_booking_response(data: str) -> bytes:
+    """Build the serialized /process-booking-data response, memoized per payload"""
+    # Parse the lines directly: the rendered bytes are cached here, so also caching
+    # the parsed rows would hold the same payload twice
+    result = _sequence_bookings(io.StringIO(data))
+    
+    # Remove processing time from response (keep it hidden)
+    return orjson.dumps({
+        'boardingSequence': result['boardingSequence'],
+        'totalBookings': result['totalBookings'],
+        'totalPassengers': result['totalPassengers'],
+        'efficiency': result['efficiency'],
+        'success': True
+    })
+
+def _run_optimization_test(data: str, iterations: int) -> Dict[str, Any]:
+    """Run the boarding pipeline repeatedly and log average metrics"""
+    booking_ids, seats_lists = processor.parse_booking_columns(data)
+    results = []
+    
+    for _ in range(iterations):
+        result = processor.process_booking_columns(booking_ids, seats_lists)
+        results.append(result)
+    
+    # Calculate average metrics (server-side only)
+    avg_time = sum(r['processingTime'] for r in results) / iterations
+    
+    # Log performance metrics (server-side only)
+    print(f"Performance Test - Bookings: {len(booking_ids)}, Iterations: {iterations}")
+    print(f"Avg Time: {avg_time:.4f}s")
+    
+    # Return only the final result without timing info
+    final_result = results[-1]
+    final_result['efficiency'] = processor.analyze_boarding_efficiency(final_result['boardingSequence'])
+    return final_result
+
+def _run_benchmark(data: str, iterations: int) -> Dict[str, Any]:
+    """Time the sequencing algorithm over several iterations and log the results"""
+    booking_ids, seats_lists = processor.parse_booking_columns(data)
+    
+    # Time the sequencing algorithm: timeit runs the whole batch with GC disabled
+    # and only reads the clock twice; the last run's result is kept for the response
+    final_result = None
+    def run_once():
+        nonlocal final_result
+        final_result = processor.process_booking_columns(booking_ids, seats_lists)
+    
+    total_time_ns = timeit.Timer(run_once, timer=time.perf_counter_ns).timeit(number=iterations)
+    avg_time = total_time_ns / iterations / 1e9
+    
+    # Log benchmark results (server-side only)
+    print(f"Benchmark Results:")
+    print(f"Bookings: {len(booking_ids)}, Iterations: {iterations}")
+    print(f"Sequence Algorithm - Avg Time: {avg_time:.4f}s")
+    
+    # Return the last iteration's sequence (no timing data)
+    final_result['efficiency'] = processor.analyze_boarding_efficiency(final_result['boardingSequence'])
+    return final_result
+
+# Request body schemas for the JSON endpoints, which read the raw Request and so
+# need their bodies documented in OpenAPI by hand
+BOOKING_PAYLOAD_SCHEMA = {
+    'type': 'object',
+    'required': ['data'],
+    'properties': {
+        'data': {'type': 'string', 'description': 'Booking lines, one "<bookingId> <seats>" per line after a header'},
+    },
+}
+ITERATIONS_PAYLOAD_SCHEMA = {
+    **BOOKING_PAYLOAD_SCHEMA,
+    'properties': {
+        **BOOKING_PAYLOAD_SCHEMA['properties'],
+        'iterations': {'type': 'integer', 'minimum': 1},
+    },
+}
+
+def _openapi_request_body(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the openapi_extra entry documenting a required JSON request body"""
+    return {'requestBody': {'required': True, 'content': {'application/json': {'schema': schema}}}}
+
+async def _read_booking_payload(request: Request) -> Dict[str, Any]:
+    """Decode a JSON request body with orjson and check for the 'data' field"""
+    payload = orjson.loads(await request.body())
+    if not isinstance(payload, dict) or 'data' not in payload:
+        raise HTTPException(status_code=400, detail="Missing 'data' field")
+    if not isinstance(payload['data'], str):
+        raise HTTPException(status_code=400, detail="'data' field must be a string")
+    return payload
+
+def _read_iterations(payload: Dict[str, Any], default: int) -> int:
+    """Return the optional 'iterations' field, checking it is a positive integer"""
+    iterations = payload.get('iterations', default)
+    if type(iterations) is not int or iterations < 1:
+        raise HTTPException(status_code=400, detail="'iterations' field must be a positive integer")
+    return iterations
+
 @app.get("/")
 async def root():
     return {"message": "Bus Boarding Optimizer API", "status": "running"}
 
-@app.post("/process-booking-data")
-async def process_booking_data(data: dict):
+@app.post("/process-booking-data", response_class=ORJSONResponse,
+          openapi_extra=_openapi_request_body(BOOKING_PAYLOAD_SCHEMA))
+async def process_booking_data(request: Request):
     """Process booking data from JSON input"""
     try:
-        if 'data' not in data:
-            raise HTTPException(status_code=400, detail="Missing 'data' field")
+        data = await _read_booking_payload(request)
         
-        bookings = processor.parse_booking_data(data['data'])
-        result = processor.generate_boarding_sequence(bookings)
+        content = await asyncio.to_thread(_render_booking_response, data['data'])
         
-        # Add efficiency analysis
-        efficiency = processor.analyze_boarding_efficiency(result['boardingSequence'])
-        
-        # Remove processing time and cache stats from response (keep them hidden)
-        response = {
-            'boardingSequence': result['boardingSequence'],
-            'totalBookings': result['totalBookings'],
-            'totalPassengers': result['totalPassengers'],
-            'efficiency': efficiency,
-            'success': True
-        }
-        
-        return response
+        return Response(content, media_type="application/json")
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.post("/upload-file")
+@app.post("/upload-file", response_class=ORJSONResponse)
 async def upload_file(file: UploadFile = File(...)):
     """Process uploaded booking data file"""
     try:
         if not file.filename.endswith(('.txt', '.csv')):
             raise HTTPException(status_code=400, detail="Only .txt and .csv files are supported")
         
-        content = await file.read()
-        data = content.decode('utf-8')
+        result = await asyncio.to_thread(_sequence_upload, file.file)
         
-        bookings = processor.parse_booking_data(data)
-        result = processor.generate_boarding_sequence(bookings)
-        
-        # Add efficiency analysis
-        efficiency = processor.analyze_boarding_efficiency(result['boardingSequence'])
-        
-        # Remove processing time and cache stats from response (keep them hidden)
+        # Remove processing time from response (keep it hidden)
         response = {
             'boardingSequence': result['boardingSequence'],
             'totalBookings': result['totalBookings'],
             'totalPassengers': result['totalPassengers'],
             'filename': file.filename,
-            'efficiency': efficiency,
+            'efficiency': result['efficiency'],
             'success': True
         }
         
-        return response
+        # Return the response directly so FastAPI skips jsonable_encoder and orjson serializes it
+        return ORJSONResponse(response)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -325,91 +584,66 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": time.time()}
 
-@app.post("/test-optimization")
-async def test_optimization(data: dict):
+@app.post("/test-optimization", response_class=ORJSONResponse,
+          openapi_extra=_openapi_request_body(ITERATIONS_PAYLOAD_SCHEMA))
+async def test_optimization(request: Request):
     """Test endpoint for optimization performance (processing time hidden from frontend)"""
     try:
-        if 'data' not in data:
-            raise HTTPException(status_code=400, detail="Missing 'data' field")
-        
-        bookings = processor.parse_booking_data(data['data'])
+        data = await _read_booking_payload(request)
         
         # Run multiple iterations for testing
-        iterations = data.get('iterations', 1)
-        results = []
-        
-        for _ in range(iterations):
-            processor.clear_cache()  # Clear cache for each iteration
-            result = processor.generate_boarding_sequence(bookings)
-            results.append(result)
-        
-        # Calculate average metrics (server-side only)
-        avg_time = sum(r['processingTime'] for r in results) / iterations
-        avg_cache_hit_rate = sum(r['cacheStats']['hitRate'] for r in results) / iterations
-        
-        # Log performance metrics (server-side only)
-        print(f"Performance Test - Bookings: {len(bookings)}, Iterations: {iterations}")
-        print(f"Avg Time: {avg_time:.4f}s, Avg Cache Hit Rate: {avg_cache_hit_rate:.2%}")
-        
-        # Return only the final result without timing info
-        final_result = processor.generate_boarding_sequence(bookings)
-        efficiency = processor.analyze_boarding_efficiency(final_result['boardingSequence'])
+        iterations = _read_iterations(data, 1)
+        final_result = await asyncio.to_thread(_run_optimization_test, data['data'], iterations)
         
         response = {
             'boardingSequence': final_result['boardingSequence'],
             'totalBookings': final_result['totalBookings'],
             'totalPassengers': final_result['totalPassengers'],
-            'efficiency': efficiency,
+            'efficiency': final_result['efficiency'],
             'testCompleted': True,
             'success': True
         }
         
-        return response
+        return ORJSONResponse(response)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.post("/benchmark")
-async def benchmark_algorithms(data: dict):
+@app.post("/benchmark", response_class=ORJSONResponse,
+          openapi_extra=_openapi_request_body(ITERATIONS_PAYLOAD_SCHEMA))
+async def benchmark_algorithms(request: Request):
     """Benchmark different algorithm implementations (timing hidden from frontend)"""
     try:
-        if 'data' not in data:
-            raise HTTPException(status_code=400, detail="Missing 'data' field")
-        
-        bookings = processor.parse_booking_data(data['data'])
-        iterations = data.get('iterations', 10)
-        
-        # Test heap-based algorithm
-        heap_times = []
-        for _ in range(iterations):
-            processor.clear_cache()
-            start = time.time()
-            result = processor.process_bookings_with_heap(bookings)
-            heap_times.append(time.time() - start)
+        data = await _read_booking_payload(request)
         
-        avg_heap_time = sum(heap_times) / len(heap_times)
+        iterations = _read_iterations(data, 10)
+        final_result = await asyncio.to_thread(_run_benchmark, data['data'], iterations)
         
-        # Log benchmark results (server-side only)
-        print(f"Benchmark Results:")
-        print(f"Bookings: {len(bookings)}, Iterations: {iterations}")
-        print(f"Heap Algorithm - Avg Time: {avg_heap_time:.4f}s")
-        
-        # Return only success status (no timing data)
-        final_result = processor.generate_boarding_sequence(bookings)
-        efficiency = processor.analyze_boarding_efficiency(final_result['boardingSequence'])
-        
-        return {
+        return ORJSONResponse({
             'boardingSequence': final_result['boardingSequence'],
             'totalBookings': final_result['totalBookings'],
             'totalPassengers': final_result['totalPassengers'],
-            'efficiency': efficiency,
+            'efficiency': final_result['efficiency'],
             'benchmarkCompleted': True,
             'success': True
-        }
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count(),
+        # "auto" picks uvloop and httptools when installed (uvicorn[standard]) and
+        # falls back to asyncio and h11 where they are not, e.g. on Windows
+        loop="auto",
+        http="auto"
+    )
\ No newline at end of file
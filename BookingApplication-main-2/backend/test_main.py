@@ -1,85 +1,104 @@
 import pytest
 import sys
 import os
+import io
+import random
+import tracemalloc
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 
 # Add the backend directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from main import app, BookingProcessor, OptimizedBoardingProcessor
+import main
+from main import (
+    app, BookingProcessor, OptimizedBoardingProcessor, MAX_CACHED_PAYLOAD_CHARS, PARSE_CACHE_BYTES, RESPONSE_CACHE_BYTES,
+    _parse_booking_rows, _parse_booking_text, _parsed_bookings_size, _render_booking_response
+)
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return BookingProcessor()
+
+
+@pytest.fixture(scope="module")
+def optimized_processor():
+    return OptimizedBoardingProcessor()
 
-client = TestClient(app)
 
 class TestBookingProcessor:
-    def setup_method(self):
-        self.processor = BookingProcessor()
-    
-    def test_calculate_seat_distance(self):
+    def test_calculate_seat_distance(self, processor):
         """Test seat distance calculation"""
-        assert self.processor.calculate_seat_distance('A1') == 1.3
-        assert self.processor.calculate_seat_distance('D20') == 20.0
-        assert self.processor.calculate_seat_distance('B10') == 10.2
-        assert self.processor.calculate_seat_distance('C5') == 5.1
+        assert processor.calculate_seat_distance('A1') == 1.3
+        assert processor.calculate_seat_distance('D20') == 20.0
+        assert processor.calculate_seat_distance('B10') == 10.2
+        assert processor.calculate_seat_distance('C5') == 5.1
     
-    def test_invalid_seat_format(self):
+    def test_invalid_seat_format(self, processor):
         """Test invalid seat format handling"""
         with pytest.raises(ValueError, match="Invalid seat format"):
-            self.processor.calculate_seat_distance('Z99')
+            processor.calculate_seat_distance('Z99')
         
         with pytest.raises(ValueError, match="Invalid seat format"):
-            self.processor.calculate_seat_distance('A')
+            processor.calculate_seat_distance('A')
         
         with pytest.raises(ValueError, match="Invalid seat format"):
-            self.processor.calculate_seat_distance('123')
+            processor.calculate_seat_distance('123')
     
-    def test_parse_booking_data_standard_format(self):
+    def test_parse_booking_data_standard_format(self, processor):
         """Test parsing standard tab-separated format"""
         data = """Booking_ID\tSeats
 101\tA1,B1
 120\tA20,C2"""
         
-        bookings = self.processor.parse_booking_data(data)
+        bookings = processor.parse_booking_data(data)
         assert len(bookings) == 2
         assert bookings[0] == {'bookingId': '101', 'seats': ['A1', 'B1']}
         assert bookings[1] == {'bookingId': '120', 'seats': ['A20', 'C2']}
     
-    def test_parse_booking_data_csv_format(self):
+    def test_parse_booking_data_csv_format(self, processor):
         """Test parsing CSV format with quotes"""
         data = """Booking_ID,Seats
 101,"A1,B1"
 120, "A20,C2" """
         
-        bookings = self.processor.parse_booking_data(data)
+        bookings = processor.parse_booking_data(data)
         assert len(bookings) == 2
         assert bookings[0] == {'bookingId': '101', 'seats': ['A1', 'B1']}
         assert bookings[1] == {'bookingId': '120', 'seats': ['A20', 'C2']}
     
-    def test_parse_booking_data_space_separated(self):
+    def test_parse_booking_data_space_separated(self, processor):
         """Test parsing space-separated format"""
         data = """Booking_ID Seats
 101 A1 B1
 120 A20 C2"""
         
-        bookings = self.processor.parse_booking_data(data)
+        bookings = processor.parse_booking_data(data)
         assert len(bookings) == 2
         assert bookings[0] == {'bookingId': '101', 'seats': ['A1', 'B1']}
         assert bookings[1] == {'bookingId': '120', 'seats': ['A20', 'C2']}
     
-    def test_parse_booking_data_mixed_formats(self):
+    def test_parse_booking_data_mixed_formats(self, processor):
         """Test parsing mixed formats"""
         data = """Booking_ID,Seats
 101,"A1,B1"
 120 A20,C2
 130\tD15,C15"""
         
-        bookings = self.processor.parse_booking_data(data)
+        bookings = processor.parse_booking_data(data)
         assert len(bookings) == 3
         assert bookings[0]['seats'] == ['A1', 'B1']
         assert bookings[1]['seats'] == ['A20', 'C2']
         assert bookings[2]['seats'] == ['D15', 'C15']
     
-    def test_parse_booking_data_skip_invalid(self):
+    def test_parse_booking_data_skip_invalid(self, processor):
         """Test skipping invalid data"""
         data = """Booking_ID Seats
 101 A1,B1
@@ -88,31 +107,99 @@ class TestBookingProcessor:
 invalid line
 130 D15,C15"""
         
-        bookings = self.processor.parse_booking_data(data)
+        bookings = processor.parse_booking_data(data)
         assert len(bookings) == 3
     
-    def test_parse_booking_data_duplicate_ids(self):
+    def test_parse_booking_data_duplicate_ids(self, processor):
         """Test handling duplicate booking IDs"""
         data = """Booking_ID Seats
 101 A1,B1
 101 A2,B2
 120 A20,C2"""
         
-        bookings = self.processor.parse_booking_data(data)
+        bookings = processor.parse_booking_data(data)
         assert len(bookings) == 2  # Duplicate should be skipped
         assert bookings[0]['bookingId'] == '101'
         assert bookings[1]['bookingId'] == '120'
     
-    def test_parse_booking_data_invalid_seats(self):
+    def test_parse_booking_data_invalid_seats(self, processor):
         """Test filtering invalid seat formats"""
         data = """Booking_ID Seats
 101 A1,B1,Z99
 120 A20,C2"""
         
-        bookings = self.processor.parse_booking_data(data)
+        bookings = processor.parse_booking_data(data)
         assert bookings[0]['seats'] == ['A1', 'B1']  # Z99 should be filtered out
     
-    def test_generate_boarding_sequence(self):
+    def test_parse_booking_data_unterminated_quote(self, processor):
+        """Test that an unterminated quote does not swallow following lines"""
+        data = 'Booking_ID,Seats\n101,"A1\n102,B1\n103,C1'
+        
+        bookings = processor.parse_booking_data(data)
+        assert bookings == [
+            {'bookingId': '101', 'seats': ['A1']},
+            {'bookingId': '102', 'seats': ['B1']},
+            {'bookingId': '103', 'seats': ['C1']}
+        ]
+    
+    def test_parse_booking_data_csv_id_with_spaces(self, processor):
+        """Test quoted CSV booking IDs containing spaces"""
+        data = 'Booking_ID,Seats\nBooking 1,"A1,B1"'
+        
+        bookings = processor.parse_booking_data(data)
+        assert bookings == [{'bookingId': 'Booking 1', 'seats': ['A1', 'B1']}]
+    
+    def test_parse_booking_data_repeated_payload(self, processor):
+        """Test that repeated payloads return independent booking lists"""
+        data = """Booking_ID Seats
+101 A1,B1"""
+        
+        first = processor.parse_booking_data(data)
+        first[0]['seats'].append('C1')
+        
+        second = processor.parse_booking_data(data)
+        assert second == [{'bookingId': '101', 'seats': ['A1', 'B1']}]
+    
+    def test_parse_booking_data_cache_bounds(self, processor):
+        """Test that the parse cache skips oversized payloads"""
+        _parse_booking_text.cache_clear()
+        data = "Booking_ID Seats\n101 A1,B1"
+        
+        processor.parse_booking_data(data)
+        processor.parse_booking_data(data)
+        assert _parse_booking_text.cache_size() == 1
+        
+        oversized = data + "\n" * MAX_CACHED_PAYLOAD_CHARS
+        assert processor.parse_booking_data(oversized) == [{'bookingId': '101', 'seats': ['A1', 'B1']}]
+        assert _parse_booking_text.cache_size() == 1
+    
+    def test_parse_booking_data_cache_retained_bytes(self, processor):
+        """Test that the parse cache keeps the parsed rows it retains within its byte budget"""
+        _parse_booking_text.cache_clear()
+        payloads = [
+            "Booking_ID Seats\n" + "\n".join(f"{batch}-{i} A{i % 20 + 1},D{i % 20 + 1}" for i in range(12000))
+            for batch in range(6)
+        ]
+        
+        for data in payloads:
+            processor.parse_booking_data(data)
+            assert _parse_booking_text.cache_bytes() <= PARSE_CACHE_BYTES
+        
+        # The budget evicted the oldest payloads, and the accounted size covers every
+        # tuple and string the remaining entries hold
+        assert 0 < _parse_booking_text.cache_size() < len(payloads)
+        retained = sum(_parsed_bookings_size(_parse_booking_text(data)) for data in payloads[-_parse_booking_text.cache_size():])
+        assert _parse_booking_text.cache_bytes() == retained
+        
+        tracemalloc.start()
+        try:
+            rows = _parse_booking_rows(io.StringIO(payloads[0]))
+            measured = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        assert abs(_parsed_bookings_size(rows) - measured) < 0.1 * measured
+    
+    def test_generate_boarding_sequence(self, processor):
         """Test boarding sequence generation"""
         bookings = [
             {'bookingId': '101', 'seats': ['A1', 'B1']},
@@ -120,7 +207,7 @@ invalid line
             {'bookingId': '150', 'seats': ['D15', 'C15']}
         ]
         
-        result = self.processor.generate_boarding_sequence(bookings)
+        result = processor.generate_boarding_sequence(bookings)
         sequence = result['boardingSequence']
         
         assert len(sequence) == 3
@@ -132,11 +219,11 @@ invalid line
         assert sequence[0]['maxDistance'] >= sequence[1]['maxDistance']
         assert sequence[1]['maxDistance'] >= sequence[2]['maxDistance']
     
-    def test_generate_boarding_sequence_single_booking(self):
+    def test_generate_boarding_sequence_single_booking(self, processor):
         """Test single booking sequence"""
         bookings = [{'bookingId': '101', 'seats': ['A10', 'B10']}]
         
-        result = self.processor.generate_boarding_sequence(bookings)
+        result = processor.generate_boarding_sequence(bookings)
         sequence = result['boardingSequence']
         
         assert len(sequence) == 1
@@ -146,14 +233,14 @@ invalid line
         assert sequence[0]['maxDistance'] == 10.3
         assert sequence[0]['minDistance'] == 10.2
     
-    def test_generate_boarding_sequence_empty(self):
+    def test_generate_boarding_sequence_empty(self, processor):
         """Test empty bookings array"""
-        result = self.processor.generate_boarding_sequence([])
+        result = processor.generate_boarding_sequence([])
         assert result['boardingSequence'] == []
         assert result['totalBookings'] == 0
         assert result['totalPassengers'] == 0
     
-    def test_analyze_boarding_efficiency(self):
+    def test_analyze_boarding_efficiency(self, processor):
         """Test efficiency analysis"""
         sequence = [
             {
@@ -172,15 +259,35 @@ invalid line
             }
         ]
         
-        efficiency = self.processor.analyze_boarding_efficiency(sequence)
+        efficiency = processor.analyze_boarding_efficiency(sequence)
         
         assert efficiency['averageDistance'] == 15.3
         assert efficiency['optimalityScore'] == 100.0  # Perfect order
         assert efficiency['blockingPotential'] == 0.0  # No blocking
     
-    def test_analyze_boarding_efficiency_empty(self):
+    def test_analyze_boarding_efficiency_blocking(self, processor):
+        """Test blocking potential on a shuffled sequence against the pairwise definition"""
+        rng = random.Random(42)
+        distances = [rng.randint(1, 40) + rng.choice([0.0, 0.1, 0.2, 0.3]) for _ in range(600)]
+        sequence = [
+            {'bookingId': str(i), 'seats': [], 'maxDistance': distance, 'minDistance': distance}
+            for i, distance in enumerate(distances)
+        ]
+        
+        expected = sum(
+            later - earlier
+            for i, earlier in enumerate(distances)
+            for later in distances[i + 1:]
+            if later > earlier
+        )
+        
+        efficiency = processor.analyze_boarding_efficiency(sequence)
+        assert expected > 0
+        assert efficiency['blockingPotential'] == pytest.approx(expected)
+    
+    def test_analyze_boarding_efficiency_empty(self, processor):
         """Test efficiency analysis with empty sequence"""
-        efficiency = self.processor.analyze_boarding_efficiency([])
+        efficiency = processor.analyze_boarding_efficiency([])
         
         assert efficiency['averageDistance'] == 0
         assert efficiency['optimalityScore'] == 0
@@ -188,27 +295,38 @@ invalid line
 
 
 class TestOptimizedBoardingProcessor:
-    def setup_method(self):
-        self.processor = OptimizedBoardingProcessor()
+    def test_seat_distance_lookup(self, optimized_processor):
+        """Test seat distance lookup from the precomputed table"""
+        assert optimized_processor.get_seat_distance('A10') == 10.3
+        assert optimized_processor.get_seat_distance('D200') == 200.0
+        
+        # Seats beyond the precomputed rows are computed on demand
+        assert optimized_processor.get_seat_distance('A250') == 250.3
+        
+        with pytest.raises(ValueError, match="Invalid seat format"):
+            optimized_processor.get_seat_distance('E1')
     
-    def test_seat_distance_caching(self):
-        """Test seat distance caching functionality"""
-        # Clear cache first
-        self.processor.clear_cache()
+    def test_seat_distance_caching(self, optimized_processor):
+        """Test memoization of seats beyond the precomputed table"""
+        OptimizedBoardingProcessor._calculate_seat_distance.cache_clear()
         
         # First call should be a cache miss
-        distance1 = self.processor.get_seat_distance('A10')
-        assert distance1 == 10.3
-        assert self.processor.cache_misses == 1
-        assert self.processor.cache_hits == 0
+        assert optimized_processor.get_seat_distance('A250') == 250.3
+        info = OptimizedBoardingProcessor._calculate_seat_distance.cache_info()
+        assert info.misses == 1
+        assert info.hits == 0
         
         # Second call should be a cache hit
-        distance2 = self.processor.get_seat_distance('A10')
-        assert distance2 == 10.3
-        assert self.processor.cache_hits == 1
-        assert self.processor.cache_misses == 1
+        assert optimized_processor.get_seat_distance('A250') == 250.3
+        info = OptimizedBoardingProcessor._calculate_seat_distance.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+        
+        # Seats within the table never reach the memoized fallback
+        optimized_processor.get_seat_distance('A10')
+        assert OptimizedBoardingProcessor._calculate_seat_distance.cache_info() == info
     
-    def test_process_bookings_with_heap(self):
+    def test_process_bookings_with_heap(self, optimized_processor):
         """Test heap-based booking processing"""
         bookings = [
             {'bookingId': '101', 'seats': ['A1', 'B1']},
@@ -216,7 +334,7 @@ class TestOptimizedBoardingProcessor:
             {'bookingId': '150', 'seats': ['D15', 'C15']}
         ]
         
-        result = self.processor.process_bookings_with_heap(bookings)
+        result = optimized_processor.process_bookings_with_heap(bookings)
         sequence = result['boardingSequence']
         
         assert len(sequence) == 3
@@ -227,7 +345,41 @@ class TestOptimizedBoardingProcessor:
         for i in range(len(sequence) - 1):
             assert sequence[i]['maxDistance'] >= sequence[i + 1]['maxDistance']
     
-    def test_large_dataset_performance(self):
+    def test_process_booking_columns(self, optimized_processor):
+        """Test struct-of-arrays processing matches list-of-dict processing"""
+        booking_ids = ['101', '120', '150']
+        seats_lists = [('A1', 'B1'), ('A20', 'C2'), ('D15', 'C15')]
+        
+        result = optimized_processor.process_booking_columns(booking_ids, seats_lists)
+        expected = optimized_processor.process_bookings_with_heap([
+            {'bookingId': booking_id, 'seats': seats}
+            for booking_id, seats in zip(booking_ids, seats_lists)
+        ])
+        
+        assert result['boardingSequence'] == expected['boardingSequence']
+        assert [entry['bookingId'] for entry in result['boardingSequence']] == ['120', '150', '101']
+        assert result['totalPassengers'] == 6
+    
+    def test_process_booking_columns_tie_break(self, optimized_processor):
+        """Test equal furthest-seat distances board in ascending booking ID order"""
+        booking_ids = ['303', '101', '202', '050', '404']
+        seats_lists = [('B5',), ('B5', 'A1'), ('C3', 'B5'), ('A7',), ('D5',)]
+        
+        result = optimized_processor.process_booking_columns(booking_ids, seats_lists)
+        assert [entry['bookingId'] for entry in result['boardingSequence']] == ['050', '101', '202', '303', '404']
+        assert [entry['sequence'] for entry in result['boardingSequence']] == [1, 2, 3, 4, 5]
+    
+    def test_process_booking_columns_rows_beyond_int16_keys(self, optimized_processor):
+        """Test ordering when sort keys no longer fit in int16 (rows above 3276)"""
+        booking_ids = ['3', '1', '4', '2', '5']
+        seats_lists = [('A1',), ('D3277',), ('A3277',), ('B5000', 'A2'), ('D3277',)]
+        
+        result = optimized_processor.process_booking_columns(booking_ids, seats_lists)
+        sequence = result['boardingSequence']
+        assert [entry['bookingId'] for entry in sequence] == ['2', '4', '1', '5', '3']
+        assert [entry['maxDistance'] for entry in sequence] == [5000.2, 3277.3, 3277.0, 3277.0, 1.3]
+    
+    def test_large_dataset_performance(self, optimized_processor):
         """Test performance with large dataset"""
         bookings = []
         for i in range(1, 101):  # 100 bookings
@@ -236,7 +388,7 @@ class TestOptimizedBoardingProcessor:
                 'seats': [f'A{i}', f'B{i}']
             })
         
-        result = self.processor.process_bookings_with_heap(bookings)
+        result = optimized_processor.process_bookings_with_heap(bookings)
         sequence = result['boardingSequence']
         
         assert len(sequence) == 100
@@ -248,7 +400,7 @@ class TestOptimizedBoardingProcessor:
 
 
 class TestAPI:
-    def test_root_endpoint(self):
+    def test_root_endpoint(self, client):
         """Test root endpoint"""
         response = client.get("/")
         assert response.status_code == 200
@@ -257,7 +409,7 @@ class TestAPI:
             "status": "running"
         }
     
-    def test_health_check(self):
+    def test_health_check(self, client):
         """Test health check endpoint"""
         response = client.get("/health")
         assert response.status_code == 200
@@ -265,7 +417,7 @@ class TestAPI:
         assert data["status"] == "healthy"
         assert "timestamp" in data
     
-    def test_process_booking_data_success(self):
+    def test_process_booking_data_success(self, client):
         """Test successful booking data processing"""
         data = {
             "data": "Booking_ID Seats\n101 A1,B1\n120 A20,C2"
@@ -282,13 +434,72 @@ class TestAPI:
         assert "efficiency" in result
         assert len(result["boardingSequence"]) == 2
     
-    def test_process_booking_data_missing_field(self):
+    def test_process_booking_data_repeated_payload(self, client):
+        """Test that a repeated payload returns an identical response"""
+        data = {"data": "Booking_ID Seats\n101 A1,B1\n120 A20,C2"}
+        
+        first = client.post("/process-booking-data", json=data)
+        second = client.post("/process-booking-data", json=data)
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+        assert [entry["bookingId"] for entry in second.json()["boardingSequence"]] == ["120", "101"]
+    
+    def test_process_booking_data_bypasses_parse_cache(self, client):
+        """Test that rendered responses are cached without also caching the parse"""
+        _parse_booking_text.cache_clear()
+        _render_booking_response.cache_clear()
+        data = {"data": "Booking_ID Seats\n101 A1,B1\n120 A20,C2"}
+        
+        client.post("/process-booking-data", json=data)
+        client.post("/process-booking-data", json=data)
+        assert _render_booking_response.cache_size() == 1
+        assert _parse_booking_text.cache_size() == 0
+    
+    def test_openapi_documents_json_bodies(self, client):
+        """Test that the JSON endpoints keep their request body schema in OpenAPI"""
+        paths = client.get("/openapi.json").json()["paths"]
+        
+        for path in ("/process-booking-data", "/test-optimization", "/benchmark"):
+            schema = paths[path]["post"]["requestBody"]["content"]["application/json"]["schema"]
+            assert schema["required"] == ["data"]
+            assert schema["properties"]["data"]["type"] == "string"
+        assert "iterations" in paths["/benchmark"]["post"]["requestBody"]["content"]["application/json"]["schema"]["properties"]
+    
+    def test_process_booking_data_cache_retained_bytes(self, client):
+        """Test that the response cache accounts for the rendered bytes it retains"""
+        _render_booking_response.cache_clear()
+        payloads = [f"Booking_ID Seats\n{100 + i} A{i + 1},B{i + 1}\n{200 + i} C{i + 2}" for i in range(3)]
+        
+        for data in payloads:
+            response = client.post("/process-booking-data", json={"data": data})
+            assert response.status_code == 200
+        
+        assert _render_booking_response.cache_size() == len(payloads)
+        assert _render_booking_response.cache_bytes() == sum(len(_render_booking_response(data)) for data in payloads)
+        assert _render_booking_response.cache_bytes() <= RESPONSE_CACHE_BYTES
+    
+    def test_process_booking_data_missing_field(self, client):
         """Test missing data field"""
         response = client.post("/process-booking-data", json={})
         assert response.status_code == 400
         assert "Missing 'data' field" in response.json()["detail"]
     
-    def test_process_booking_data_invalid_format(self):
+    def test_process_booking_data_malformed_json(self, client):
+        """Test malformed JSON request body"""
+        response = client.post(
+            "/process-booking-data",
+            content=b'{"data": ',
+            headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == 400
+    
+    def test_process_booking_data_non_string_data(self, client):
+        """Test non-string data field"""
+        response = client.post("/process-booking-data", json={"data": ["101 A1"]})
+        assert response.status_code == 400
+        assert "'data' field must be a string" in response.json()["detail"]
+    
+    def test_process_booking_data_invalid_format(self, client):
         """Test invalid booking data format"""
         data = {"data": "invalid data format"}
         
@@ -298,7 +509,7 @@ class TestAPI:
         result = response.json()
         assert result["totalBookings"] == 0
     
-    def test_upload_file_success(self):
+    def test_upload_file_success(self, client):
         """Test successful file upload"""
         file_content = "Booking_ID,Seats\n101,\"A1,B1\"\n120,\"A20,C2\""
         files = {"file": ("test.csv", file_content, "text/csv")}
@@ -311,7 +522,24 @@ class TestAPI:
         assert result["filename"] == "test.csv"
         assert "boardingSequence" in result
     
-    def test_upload_file_invalid_extension(self):
+    def test_upload_file_spanning_chunks(self, client, monkeypatch):
+        """Test uploads read over many chunks split lines exactly like pasted text"""
+        monkeypatch.setattr(main, "UPLOAD_CHUNK_SIZE", 3)
+        # 'é' and the '\r\n' pairs straddle 3-byte chunk boundaries; '\x0c' is not a line break
+        file_content = "Booking_ID Seats\r\n1é A1,B1\r\n120 A20,C2\x0c150 D15\n"
+        
+        lines = list(main._iter_upload_lines(io.BytesIO(file_content.encode())))
+        assert lines == list(io.StringIO(file_content))
+        
+        files = {"file": ("test.txt", file_content.encode(), "text/plain")}
+        response = client.post("/upload-file", files=files)
+        assert response.status_code == 200
+        
+        pasted = client.post("/process-booking-data", json={"data": file_content}).json()
+        assert response.json()["boardingSequence"] == pasted["boardingSequence"]
+        assert [entry["bookingId"] for entry in pasted["boardingSequence"]] == ["120", "1é"]
+    
+    def test_upload_file_invalid_extension(self, client):
         """Test invalid file extension"""
         files = {"file": ("test.pdf", "content", "application/pdf")}
         
@@ -319,7 +547,7 @@ class TestAPI:
         assert response.status_code == 400
         assert "Only .txt and .csv files are supported" in response.json()["detail"]
     
-    def test_test_optimization_success(self):
+    def test_test_optimization_success(self, client):
         """Test optimization testing endpoint"""
         data = {
             "data": "Booking_ID Seats\n101 A1,B1\n120 A20,C2",
@@ -334,7 +562,7 @@ class TestAPI:
         assert result["testCompleted"] is True
         assert "boardingSequence" in result
     
-    def test_benchmark_success(self):
+    def test_benchmark_success(self, client):
         """Test benchmark endpoint"""
         data = {
             "data": "Booking_ID Seats\n101 A1,B1\n120 A20,C2",
@@ -348,10 +576,36 @@ class TestAPI:
         assert result["success"] is True
         assert result["benchmarkCompleted"] is True
         assert "boardingSequence" in result
+    
+    def test_benchmark_runs_each_iteration_once(self, client):
+        """Test that the benchmark sequences the bookings exactly once per iteration"""
+        data = {
+            "data": "Booking_ID Seats\n101 A1,B1\n120 A20,C2",
+            "iterations": 4
+        }
+        
+        with patch.object(main.processor, "process_booking_columns", wraps=main.processor.process_booking_columns) as spy:
+            response = client.post("/benchmark", json=data)
+        assert response.status_code == 200
+        assert spy.call_count == 4
+        assert [entry["bookingId"] for entry in response.json()["boardingSequence"]] == ["120", "101"]
+    
+    @pytest.mark.parametrize("endpoint", ["/test-optimization", "/benchmark"])
+    @pytest.mark.parametrize("iterations", [0, -1, "2", 1.5, True])
+    def test_invalid_iterations(self, client, endpoint, iterations):
+        """Test that iterations must be a positive integer"""
+        data = {
+            "data": "Booking_ID Seats\n101 A1,B1",
+            "iterations": iterations
+        }
+        
+        response = client.post(endpoint, json=data)
+        assert response.status_code == 400
+        assert "'iterations' field must be a positive integer" in response.json()["detail"]
 
 
 class TestIntegration:
-    def test_end_to_end_csv_processing(self):
+    def test_end_to_end_csv_processing(self, client):
         """Test complete CSV processing workflow"""
         csv_content = '''Booking_ID,Seats
 101,"A1,B1"
@@ -375,7 +629,7 @@ class TestIntegration:
         assert sequence[0]["maxDistance"] >= sequence[1]["maxDistance"]
         assert sequence[1]["maxDistance"] >= sequence[2]["maxDistance"]
     
-    def test_end_to_end_complex_booking(self):
+    def test_end_to_end_complex_booking(self, client):
         """Test complex booking scenario"""
         data = {
             "data": """Booking_ID Seats